@@ -0,0 +1,54 @@
+"""Development-only debugging tools for the nmrmint GUI.
+
+Provides the following functions:
+* trace_calls: a sys.settrace hook that reports calls to selected functions.
+* install_trace: installs trace_calls, only if the NMRMINT_TRACE environment
+variable is set.
+"""
+
+import os
+import sys
+
+# Only calls to code inside the nmrmint package are reported.
+_PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# following is taken from PyMOTW: https://pymotw.com/2/sys/tracing.html
+def trace_calls(frame, event, arg):
+    if arg:
+        print('arg passed to trace_calls')  # need to recheck why arg is needed
+    if event != 'call':
+        return
+    co = frame.f_code
+    func_name = co.co_name
+    if func_name == 'write':
+        # Ignore write() calls from print statements
+        return
+    func_line_no = frame.f_lineno
+    func_filename = co.co_filename
+
+    if not func_filename.startswith(_PACKAGE_DIR):
+        return
+
+    # use conditionals below to narrow focus
+    if "widgets.py" not in func_filename:
+        return
+
+    if func_name != "_on_return":
+        return
+
+    caller = frame.f_back
+    caller_line_no = caller.f_lineno
+    caller_filename = caller.f_code.co_filename
+    print('Call to %s on line %s of %s from line %s of %s' %
+          (func_name, func_line_no, func_filename,
+           caller_line_no, caller_filename))
+    return
+
+
+def install_trace():
+    """Install trace_calls as the trace function, if the NMRMINT_TRACE
+    environment variable is set.
+    """
+    if os.environ.get('NMRMINT_TRACE'):
+        sys.settrace(trace_calls)
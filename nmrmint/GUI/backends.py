@@ -10,23 +10,37 @@ Provides the following functions:
 * save_as_pdf: plots and saves a figure in PDF format.
 """
 
-from tkinter import *
+from tkinter import BOTH, TOP
 from tkinter.filedialog import asksaveasfilename
 
-import matplotlib
-matplotlib.use("TkAgg")  # must be invoked before the imports below
-
 from matplotlib.backends.backend_tkagg import (FigureCanvasTkAgg,
                                                NavigationToolbar2TkAgg)
 from matplotlib.backends.backend_pdf import FigureCanvasPdf
 from matplotlib.backends.backend_ps import FigureCanvasPS
 from matplotlib.figure import Figure
+import numpy as np
+
+from nmrmint.model.nmrplot import decimate
+
+# Horizontal resolution that exported line art is reduced to. Well above
+# what a printer resolves, but far fewer points than the simulation grid.
+_EXPORT_DPI = 600
+# On screen, lines are reduced to this many min/max bins per pixel.
+_SCREEN_BINS_PER_PIXEL = 2
 
 
 class MPLplot(FigureCanvasTkAgg):
     """Extends on FigureCanvasTkAgg by including a
     matplotlib Figure object, plus an API for plotting.
 
+    Each axis holds a single, persistent line. When new data doesn't change
+    an axis's limits, only that line is redrawn (blitted) over a cached
+    background of the axis, rather than redrawing the entire figure.
+
+    The lines are given only as many points as the axes can show at their
+    current width and zoom level; the full data is kept, and is decimated
+    again whenever the figure is redrawn (e.g. after a zoom or resize).
+
     Attributes:
         x_min, x_max: minimum and maximum values for the x axis.
 
@@ -53,44 +67,142 @@ class MPLplot(FigureCanvasTkAgg):
         # self.total_plot.invert_xaxis()
         self.x_min = -1  # ppm
         self.x_max = 12  # ppm
+
+        # Animated lines are left out of full figure draws, and drawn by
+        # _on_draw on top of the freshly captured axis backgrounds.
+        self._current_line, = self._current_plot.plot([], [], linewidth=1,
+                                                      animated=True)
+        self._total_line, = self._total_plot.plot([], [], linewidth=1,
+                                                  animated=True)
+        self._backgrounds = {}
+        self._printing = False  # see print_figure
+        self._line_data = {self._current_line: ([], []),
+                           self._total_line: ([], [])}
+        self.mpl_connect('draw_event', self._on_draw)
+
         self.get_tk_widget().pack(side=TOP, fill=BOTH, expand=1)
         self._toolbar = NavigationToolbar2TkAgg(self, master)
         self._toolbar.update()
 
-    def plot_current(self, x, y):
-        """Plot x, y data to the current_plot axis.
+    def _on_draw(self, event):
+        """After a full figure draw, cache each axis's background and draw
+        its line on top, decimated for the axis's current size and limits.
 
-        Requires self._set_current_window() to set an appropriate zoom level.
+        Draws for saving the figure (see print_figure) are ignored: they may
+        be made by another (e.g. PDF) canvas, and at another resolution.
+        """
+        if event.canvas is not self or self._printing:
+            return
+        for axes, line in ((self._current_plot, self._current_line),
+                           (self._total_plot, self._total_line)):
+            self._backgrounds[axes] = self.copy_from_bbox(axes.bbox)
+            line.set_data(*self._screen_data(axes, *self._line_data[line]))
+            axes.draw_artist(line)
+
+    def print_figure(self, *args, **kwargs):
+        """Extend FigureCanvasTkAgg.print_figure so that saved figures (e.g.
+        from the navigation toolbar) include the plotted lines.
+
+        The lines are animated, so a normal figure draw leaves them out;
+        while printing they are drawn as ordinary artists, with their full
+        data.
+        """
+        lines = (self._current_line, self._total_line)
+        self._printing = True
+        for line in lines:
+            line.set_animated(False)
+            line.set_data(*self._line_data[line])
+        try:
+            return super().print_figure(*args, **kwargs)
+        finally:
+            for line in lines:
+                line.set_animated(True)
+            self._printing = False
+            # Printing can replace the renderer, so the screen, the cached
+            # backgrounds and the decimated lines are all refreshed.
+            self.draw_idle()
+
+    @staticmethod
+    def _screen_data(axes, x, y):
+        """Decimate x, y data to the horizontal resolution of an axis.
+
+        The full x range is kept (not just the visible window), so the
+        decimated data has the same y extremes for autoscaling.
+
+        :param axes: the matplotlib Axes the data is shown in
+        :param x: (numpy ndarray) x coordinates, in ascending order.
+        :param y: (numpy ndarray)
+        :return: (numpy ndarray, numpy ndarray) the decimated x, y data.
+        """
+        x_min, x_max = sorted(axes.get_xlim())
+        if len(x) < 2 or x_max <= x_min:
+            return x, y
+        bins = (_SCREEN_BINS_PER_PIXEL * axes.bbox.width
+                * (x[-1] - x[0]) / (x_max - x_min))
+        return decimate(x, y, (x[0], x[-1]), bins)
+
+    def _set_line_data(self, axes, line, x, y):
+        """Keep the full x, y data for a line, and set the line to its
+        decimated version.
+        """
+        self._line_data[line] = (x, y)
+        line.set_data(*self._screen_data(axes, x, y))
+
+    def _update_line(self, axes, line, x, y, xlim):
+        """Replace a line's data and refresh its axis.
 
+        The x axis is set to xlim and the y axis is rescaled to the new data.
+        If the axis limits are unchanged, the line is blitted onto the cached
+        background; otherwise a full redraw is requested.
+
+        :param axes: the matplotlib Axes holding the line
+        :param line: the matplotlib Line2D to update
         :param x: (numpy ndarray)
         :param y: (numpy ndarray)
+        :param xlim: (float, float) the new (left, right) x limits
         """
-        self._current_plot.invert_xaxis()  # for NMR style high-->low
-        self._set_current_window(x, y)
-        self._current_plot.plot(x, y, linewidth=1)
-        self.draw_idle()
+        previous_limits = (axes.get_xlim(), axes.get_ylim())
+        axes.set_xlim(*xlim)
+        self._set_line_data(axes, line, x, y)
+        axes.relim()
+        axes.autoscale_view(scalex=False)
+        limits = (axes.get_xlim(), axes.get_ylim())
+        if limits != previous_limits or axes not in self._backgrounds:
+            self.draw_idle()
+            return
+        self.restore_region(self._backgrounds[axes])
+        axes.draw_artist(line)
+        self.blit(axes.bbox)
 
-    def _set_current_window(self, x, y):
-        """Find the x limits of the current signal (> 1% intensity) and set
-        the window to be 0.2 ppm on either side.
+    def plot_current(self, x, y):
+        """Plot x, y data to the current_plot axis, zoomed in on the signal
+        (see _current_window).
+
+        :param x: (numpy ndarray)
+        :param y: (numpy ndarray)
         """
-        left = False
-        right = False
+        self._update_line(self._current_plot, self._current_line, x, y,
+                          xlim=self._current_window(x, y))
 
-        for i, intensity in enumerate(y):
-            if intensity > 0.01:
-                left = i
-                break
+    @staticmethod
+    def _current_window(x, y):
+        """Find the x limits of the current signal (> 1% intensity) and
+        return a window 0.2 ppm wider on either side.
 
-        for j, intensity in enumerate(reversed(y)):
-            if intensity > 0.01:
-                right = j
-                break
+        :param x: (numpy ndarray)
+        :param y: (numpy ndarray)
+        :return: (float, float) the x limits, high to low (NMR style).
+        """
+        signal = np.flatnonzero(np.asarray(y) > 0.01)
+        if signal.size:
+            left = signal[0]
+            right = len(y) - 1 - signal[-1]  # counted from the end
+        else:
+            left = right = 0
 
         x_min = x[left] - 0.2
         x_max = x[-right] + 0.2
-        self._current_plot.set_xlim(x_max, x_min)  # should flip x axis
-        self.draw_idle()
+        return x_max, x_min
 
     def plot_total(self, x, y):
         """Plot x, y data to the total_plot axis.
@@ -98,8 +210,8 @@ class MPLplot(FigureCanvasTkAgg):
         :param x: (numpy ndarray)
         :param y: (numpy ndarray)
         """
-        self._total_plot.plot(x, y, linewidth=1)
-        self.set_total_plot_window()
+        self._update_line(self._total_plot, self._total_line, x, y,
+                          xlim=(self.x_max, self.x_min))
 
     def set_total_plot_window(self, *x_limits):
         """Set the width of the total spectrum.
@@ -109,25 +221,38 @@ class MPLplot(FigureCanvasTkAgg):
         """
         if x_limits:
             self.x_min, self.x_max = x_limits
-        self._total_plot.set_xlim(self.x_max, self.x_min)  # should flip x axis
+        limits = (self.x_max, self.x_min)  # should flip x axis
+        if self._total_plot.get_xlim() == limits:
+            return
+        self._total_plot.set_xlim(*limits)
+        # Ticks change, so the figure is redrawn; the redraw also recaptures
+        # the blitting background (see _on_draw).
         self.draw_idle()
 
     def clear_current(self):
-        """Clear the current spectrum plot"""
-        self._current_plot.clear()
-        self._figure.canvas.draw_idle()
+        """Clear the current spectrum plot.
+
+        The canvas is not redrawn; it is refreshed by the next plot_current.
+        """
+        self._set_line_data(self._current_plot, self._current_line, [], [])
 
     def clear_total(self):
-        """Clear the summation spectrum plot."""
-        self._total_plot.clear()
-        self._figure.canvas.draw_idle()
+        """Clear the summation spectrum plot.
+
+        The canvas is not redrawn; it is refreshed by the next plot_total.
+        """
+        self._set_line_data(self._total_plot, self._total_line, [], [])
 
 
 def _create_figure(x, y, xlim, figsize):
+    x_shown, y_shown = decimate(x, y, xlim, figsize[0] * _EXPORT_DPI)
     figure = Figure(figsize=figsize)
     axes = figure.add_subplot(111)
-    axes.plot(x, y, linewidth=0.3)
+    axes.plot(x_shown, y_shown, linewidth=0.3)
     axes.set_xlim(*xlim)
+    # Scale y to all of the data, as on screen, not just the exported window
+    axes.update_datalim(((x[0], y.min()), (x[-1], y.max())))
+    axes.autoscale_view(scalex=False)
     return figure
 
 
@@ -141,13 +266,14 @@ def save_as_eps(x, y, xlim, figsize, orientation):
     :param figsize: (float, float) a tuple of (plot width, plot height) in
     inches.
     :param orientation: 'landscape' or 'portrait'"""
+    filename = asksaveasfilename()
+    if not filename:
+        return
+    if filename[-4:] != '.eps':
+        filename += '.eps'
     figure = _create_figure(x, y, xlim, figsize)
     backend = FigureCanvasPS(figure)
-    filename = asksaveasfilename()
-    if filename:
-        if filename[-4:] != '.eps':
-            filename += '.eps'
-        backend.print_eps(filename, orientation=orientation)
+    backend.print_eps(filename, orientation=orientation)
 
 
 def save_as_pdf(x, y, xlim, figsize):
@@ -163,10 +289,11 @@ def save_as_pdf(x, y, xlim, figsize):
     :param figsize: (float, float) a tuple of (plot width, plot height) in
     inches.
     """
+    filename = asksaveasfilename()
+    if not filename:
+        return
+    if filename[-4:] != '.pdf':
+        filename += '.pdf'
     figure = _create_figure(x, y, xlim, figsize)
     backend = FigureCanvasPdf(figure)
-    filename = asksaveasfilename()
-    if filename:
-        if filename[-4:] != '.pdf':
-            filename += '.pdf'
-        backend.print_pdf(filename)
+    backend.print_pdf(filename)
@@ -4,7 +4,7 @@ Provides the following class:
 * RadioFrame: extends tkinter Frame by adding a radiobutton list and title label
 """
 
-from tkinter import *
+from tkinter import Frame, Label, Radiobutton, StringVar, Tk, NW, TOP
 
 
 class RadioFrame(Frame):
@@ -15,6 +15,25 @@ between subspectra objects.
 # If this is done, toolbar should be refactored out of Subspectrum as well.
 
 import copy
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _hash_vars(vars_):
+    """Return a hashable, comparable representation of a toolbar vars dict.
+
+    :param vars_: {str: float, int, or numpy.ndarray}, or None
+    :return: (tuple) of (key, value) pairs, with arrays replaced by their
+    shape and raw bytes; or None if vars_ is None.
+    """
+    if vars_ is None:
+        return None
+    return tuple((key, (val.shape, val.tobytes())
+                  if isinstance(val, np.ndarray) else val)
+                 for key, val in sorted(vars_.items()))
 
 
 class Subspectrum:
@@ -40,8 +59,10 @@ class Subspectrum:
         * active: Boolean indicating whether the subspectrum is currently
     added to the total spectrum.
 
-    Provides the following method:
+    Provides the following methods:
         * toggle_active: toggles the activity
+        * vars_key: returns a hashable representation of vars, cached until
+    vars is replaced
     """
     def __init__(self, model=None, vars_=None, x=None, y=None,
                  toolbar=None,
@@ -61,12 +82,34 @@ class Subspectrum:
         for addition to the total spectrum.
         """
         self.model = model
+        self._vars_key = None
         self.vars = vars_
         self.x = x
         self.y = y
         self.toolbar = toolbar
         self.active = activity
 
+    @property
+    def vars(self):
+        return self._vars
+
+    @vars.setter
+    def vars(self, vars_):
+        self._vars = vars_
+        self._vars_key = None
+
+    def vars_key(self):
+        """Return a hashable, comparable representation of vars.
+
+        The key is computed once per assignment to vars, so vars must be
+        replaced rather than modified in place (as History does).
+
+        :return: (tuple)
+        """
+        if self._vars_key is None:
+            self._vars_key = _hash_vars(self._vars)
+        return self._vars_key
+
     def toggle_active(self):
         """Toggle the subspectrum between active and inactive states.
 
@@ -132,8 +175,11 @@ class History:
         :param model: (str) 'first_order' or 'nspin'
         :param vars_: (dict) of simulation parameters
         """
-        self.current_subspectrum().model = model
-        self.current_subspectrum().vars = copy.deepcopy(vars_)
+        subspectrum = self.current_subspectrum()
+        subspectrum.model = model
+        # Unchanged vars are kept, along with their cached vars_key
+        if _hash_vars(vars_) != subspectrum.vars_key():
+            subspectrum.vars = copy.deepcopy(vars_)
 
     #########################################################################
     # Methods below provide the public API
@@ -176,7 +222,7 @@ class History:
         :return: (bool) True if deletion performed; False if not.
         """
         if len(self._subspectra) == 1:
-            print("Can't delete subspectrum: only one left!")
+            logger.warning("Can't delete subspectrum: only one left!")
             return False
         if self.current_subspectrum().active:
             self.remove_current_from_total()
@@ -192,8 +238,8 @@ class History:
             self.current_subspectrum().toolbar = self._toolbar
             self._update_vars(self._toolbar.model, self._toolbar.vars)
         except AttributeError:
-            print('HISTORY TOOLBAR ERROR: Tried to save a state for a '
-                  'non-existent toolbar!!!')
+            logger.error('HISTORY TOOLBAR ERROR: Tried to save a state for a '
+                         'non-existent toolbar!!!')
 
     def restore(self):
         """restores the history._toolbar to that recorded in the subspectrum"""
@@ -292,13 +338,17 @@ class History:
         self.save()
         self.save_total_lineshape(*blank_spectrum)
         if len(self._subspectra) != len(lineshapes):
-            print('MISMATCH IN NUMBER OF SUBSPECTRA AND OF LINESHAPES')
+            logger.error('MISMATCH IN NUMBER OF SUBSPECTRA AND OF LINESHAPES')
             return
+        active_ys = []
         for subspectrum, lineshape in zip(self._subspectra, lineshapes):
             x, y = lineshape
             subspectrum.x, subspectrum.y = x, y
             if subspectrum.active:
-                self.total_y += y
+                active_ys.append(y)
+        if active_ys:
+            # a new array, so the blank spectrum's y data is not modified
+            self.total_y = self.total_y + np.sum(active_ys, axis=0)
 
     # Debugging routines below:
 
@@ -309,31 +359,31 @@ class History:
             ss_prev = self._subspectra[self.current - 1]
         else:
             ss_prev = None
-        print('=' * 10)
-        print('HISTORY DUMP ON: ', str(self.current))
-        print('Current subspectrum dump:')
-        print('model: ', ss_current.model)
-        print('vars: ', ss_current.vars)
+        logger.debug('=' * 10)
+        logger.debug('HISTORY DUMP ON: %s', str(self.current))
+        logger.debug('Current subspectrum dump:')
+        logger.debug('model: %s', ss_current.model)
+        logger.debug('vars: %s', ss_current.vars)
         toolbar = ss_current.toolbar
         if toolbar:
-            print('toolbar model: ', ss_current.toolbar.model)
-            print('toolbar vars: ', ss_current.toolbar.vars)
+            logger.debug('toolbar model: %s', ss_current.toolbar.model)
+            logger.debug('toolbar vars: %s', ss_current.toolbar.vars)
         else:
-            print('No current toolbar.')
-        print()
+            logger.debug('No current toolbar.')
+        logger.debug('')
         if ss_prev:
-            print('Previous subspectrum dump:')
-            print('model: ', ss_prev.model)
-            print('vars: ', ss_prev.vars)
-            print('toolbar model: ', ss_prev.toolbar.model)
-            print('toolbar vars: ', ss_prev.toolbar.vars)
+            logger.debug('Previous subspectrum dump:')
+            logger.debug('model: %s', ss_prev.model)
+            logger.debug('vars: %s', ss_prev.vars)
+            logger.debug('toolbar model: %s', ss_prev.toolbar.model)
+            logger.debug('toolbar vars: %s', ss_prev.toolbar.vars)
             if ss_current == ss_prev:
-                print('subspectra are equal???')
+                logger.debug('subspectra are equal???')
             if ss_current is ss_prev:
-                print('WARNING: SUBSPECTRA ARE THE SAME OBJECT')
+                logger.debug('WARNING: SUBSPECTRA ARE THE SAME OBJECT')
             if ss_current.vars == ss_prev.vars:
-                print('subspectra have same vars')
+                logger.debug('subspectra have same vars')
             if ss_current.vars is ss_prev.vars:
-                print('WARNING: SUBSPECTRA SHARE THE SAME VARS DICT')
+                logger.debug('WARNING: SUBSPECTRA SHARE THE SAME VARS DICT')
         else:
-            print('No previous spectrum')
+            logger.debug('No previous spectrum')
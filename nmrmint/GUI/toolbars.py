@@ -11,14 +11,37 @@ simulations of up to 8 coupled spins.
     *SecondOrderSpinBar: Subclass of SecondOrderBar that uses spinbox widgets.
 """
 
-import copy
-from tkinter import *
+from functools import partial
+from tkinter import (Button, Canvas, Frame, Label, Tk, Toplevel, LEFT, N, NONE,
+                     NW, RIGHT, TOP)
 
 import numpy as np
 
 from nmrmint.GUI.widgets import (ArrayBox, ArraySpinBox, VarBox, IntBox)
 from nmrmint.initialize import nspin_defaults
 
+_MAX_SPINS = 8
+
+# Widget names for frequencies (V1, V2...) and couplings (_J_NAMES[1][2] is
+# 'J12'), so that they are not rebuilt every time widgets are created.
+_V_NAMES = tuple('V%d' % (i + 1) for i in range(_MAX_SPINS))
+_J_NAMES = tuple(tuple('J%d%d' % (col, row) for row in range(_MAX_SPINS + 1))
+                 for col in range(_MAX_SPINS + 1))
+
+
+def _snapshot(vars_):
+    """Return a copy of a toolbar vars dict, with any numpy arrays copied
+    rather than shared.
+
+    Cheaper than copy.deepcopy for the flat dicts of floats/arrays that
+    toolbars use.
+
+    :param vars_: {str: float, int, or numpy.ndarray}
+    :return: {str: float, int, or numpy.ndarray}
+    """
+    return {key: (val.copy() if isinstance(val, np.ndarray) else val)
+            for key, val in vars_.items()}
+
 
 class _ToolBar(Frame):
     """Extend tkinter.Frame with a callback reference, a model
@@ -57,8 +80,7 @@ class _ToolBar(Frame):
         self._reset_button = Button(self,
                                     name='reset_button',
                                     text='Reset',
-                                    command=lambda:
-                                    self._restore_defaults_and_refresh())
+                                    command=self._restore_defaults_and_refresh)
         self._reset_button.pack(side=RIGHT)
 
     @property
@@ -71,13 +93,22 @@ class _ToolBar(Frame):
     def vars(self):
         return self._vars
 
+    def _refresh(self):
+        """Call the toolbar's current callback.
+
+        Child widgets are given this bound method rather than the callback
+        itself, so that the callback is looked up when called and any later
+        rebinding of self.callback is respected.
+        """
+        self.callback()
+
     def _restore_defaults_and_refresh(self):
         self.restore_defaults()
-        self.callback()
+        self._refresh()
 
     def restore_defaults(self):
-        # deepcopy to prevent corruption of _defaults by reset
-        self.reset(copy.deepcopy(self._defaults))
+        # copy to prevent corruption of _defaults by reset
+        self.reset(_snapshot(self._defaults))
 
     def reset(self, _vars):
         pass
@@ -119,7 +150,7 @@ class FirstOrderBar(_ToolBar):
         self._vars = self._defaults.copy()
         self._fields = {}
         kwargs = {'dict_': self.vars,
-                  'callback': self.callback}
+                  'callback': self._refresh}
         for key in ['# of nuclei', 'JAX', '#A', 'JBX', '#B', 'JCX', '#C',
                     'JDX', '#D', 'Vcentr', 'width']:
             if '#' not in key:
@@ -134,6 +165,8 @@ class FirstOrderBar(_ToolBar):
 
         :param vars_: {}
         """
+        if vars_ == self._vars:
+            return
         for key, val in vars_.items():
             self.vars[key] = val
             widget = self._fields[key]
@@ -179,12 +212,14 @@ class SecondOrderBar(_ToolBar):
         self._v_ppm, self._j = nspin_defaults(n)
         self._w_array = np.array([[0.5]])
         self._vars = self._create_var_dict()
-        self._defaults = copy.deepcopy(self._vars)  # for resetting toolbar
+        self._defaults = _snapshot(self._vars)  # for resetting toolbar
 
+        # Entry widgets are built the first time the toolbar is packed or
+        # gridded, so toolbars that are never displayed stay cheap.
+        self._n = n
         self._fields = {}
-        self._add_frequency_widgets(n)
-        self._add_peakwidth_widget()
-        self._add_J_button(n)
+        self._v_fields = []  # frequency widgets, in V1..Vn order
+        self._built = False
 
     @property
     def vars(self):
@@ -202,23 +237,45 @@ class SecondOrderBar(_ToolBar):
                 'j': self._j,
                 'w': self._w_array}
 
+    def pack_configure(self, *args, **kwargs):
+        self._build_widgets()
+        _ToolBar.pack_configure(self, *args, **kwargs)
+
+    pack = pack_configure
+
+    def grid_configure(self, *args, **kwargs):
+        self._build_widgets()
+        _ToolBar.grid_configure(self, *args, **kwargs)
+
+    grid = grid_configure
+
+    def _build_widgets(self):
+        """Create the toolbar's entry widgets, if not already created."""
+        if self._built:
+            return
+        self._built = True
+        self._add_frequency_widgets(self._n)
+        self._add_peakwidth_widget()
+        self._add_J_button(self._n)
+
     def _add_frequency_widgets(self, n):
         """Add frequency-entry widgets to the toolbar.
 
         :param n: (int) The number of nuclei being simulated.
         """
+        kwargs = {'array': self._v_ppm,
+                  'callback': self._refresh}
         for freq in range(n):
-            name = 'V' + str(freq + 1)
-            vbox = ArrayBox(self, array=self._v_ppm, coord=(0, freq),
-                            name=name,
-                            callback=self.callback)
+            name = _V_NAMES[freq]
+            vbox = ArrayBox(self, coord=(0, freq), name=name, **kwargs)
             self._fields[name] = vbox
+            self._v_fields.append(vbox)
             vbox.pack(side=LEFT)
 
     def _add_peakwidth_widget(self):
         """Add peak width-entry widget to the toolbar."""
         wbox = ArrayBox(self, array=self._w_array, coord=(0, 0), name="W",
-                        callback=self.callback)
+                        callback=self._refresh)
         self._fields['W'] = wbox
         wbox.pack(side=LEFT)
 
@@ -228,7 +285,7 @@ class SecondOrderBar(_ToolBar):
         :param n: (int) The number of nuclei being simulated.
         """
         vj_button = Button(self, text="Enter Js",
-                           command=lambda: self._vj_popup(n))
+                           command=partial(self._vj_popup, n))
         vj_button.pack(side=LEFT, expand=N, fill=NONE)
 
     def _vj_popup(self, n):
@@ -240,36 +297,51 @@ class SecondOrderBar(_ToolBar):
         """
         tl = Toplevel()
         Label(tl, text='Second-Order Simulation').pack(side=TOP)
-        datagrid = Frame(tl)
-
-        # For gridlines, background set to the line color (e.g. 'black')
-        datagrid.config(background='black')
-
-        Label(datagrid, bg='gray90').grid(row=0, column=0, sticky=NSEW,
-                                          padx=1, pady=1)
-        for col in range(1, n + 1):
-            Label(datagrid, text='V%d' % col, width=8, height=3,
-                  bg='gray90').grid(
-                row=0, column=col, sticky=NSEW, padx=1, pady=1)
 
+        # Gridlines, header cells and the unused (greyed-out) cells are drawn
+        # on a single Canvas; only the entry widgets are real Tk widgets.
+        cell_w, cell_h = 70, 50
+        width, height = (n + 1) * cell_w, (n + 1) * cell_h
+        datagrid = Canvas(tl, width=width + 1, height=height + 1,
+                          background='black', highlightthickness=0)
+
+        def cell(row, col):
+            """Return the inner (x0, y0, x1, y1) bounds of a grid cell."""
+            x0, y0 = col * cell_w + 1, row * cell_h + 1
+            return x0, y0, x0 + cell_w - 1, y0 + cell_h - 1
+
+        def place(widget, row, col):
+            x0, y0, x1, y1 = cell(row, col)
+            datagrid.create_window(x0, y0, window=widget, anchor=NW,
+                                   width=x1 - x0, height=y1 - y0)
+
+        for col in range(0, n + 1):
+            datagrid.create_rectangle(*cell(0, col), fill='gray90', width=0)
+            if col:
+                x0, y0, x1, y1 = cell(0, col)
+                datagrid.create_text((x0 + x1) / 2, (y0 + y1) / 2,
+                                     text=_V_NAMES[col - 1])
+
+        v_kwargs = {'array': self._v_ppm,
+                    'color': 'gray90',
+                    'callback': self._refresh}
+        j_kwargs = {'array': self._j,
+                    'callback': self._refresh}
         for row in range(1, n + 1):
-            vtext = "V" + str(row)
-            v = ArrayBox(datagrid, array=self._v_ppm,
+            v = ArrayBox(datagrid,
                          coord=(0, row - 1),  # V1 stored in v[0, 0], etc.
-                         name=vtext, color='gray90',
-                         callback=self.callback)
-            v.grid(row=row, column=0, sticky=NSEW, padx=1, pady=1)
+                         name=_V_NAMES[row - 1], **v_kwargs)
+            place(v, row, 0)
             for col in range(1, n + 1):
                 if col < row:
-                    j = ArrayBox(datagrid, array=self._j,
+                    j = ArrayBox(datagrid,
                                  # J12 stored in _j[0, 1] (and _j[1, 0]) etc
                                  coord=(col - 1, row - 1),
-                                 name="J%d%d" % (col, row),
-                                 callback=self.callback)
-                    j.grid(row=row, column=col, sticky=NSEW, padx=1, pady=1)
+                                 name=_J_NAMES[col][row], **j_kwargs)
+                    place(j, row, col)
                 else:
-                    Label(datagrid, bg='grey').grid(
-                        row=row, column=col, sticky=NSEW, padx=1, pady=1)
+                    datagrid.create_rectangle(*cell(row, col), fill='grey',
+                                              width=0)
         datagrid.pack()
 
     def reset(self, _vars):
@@ -282,19 +354,28 @@ class SecondOrderBar(_ToolBar):
         TODO: factor out clunky use of 2D arrays for v and w, to 1D array and
         float.
         """
-        # bug fix: ._v_ppm and ._w_array cannot be completely replaced with
-        # corresponding _vars array, because it will break links to widget
-        # arrays.
-        self._v_ppm[0] = _vars['v'][0]
-        # .j is only used in popup window, where ArrayBox widgets are created
-        #  fresh each time. So, OK for now to replace entire _j  array
-        # reference.
-        self._j = _vars['j']
-        self._w_array[0][0] = _vars['w'][0][0]
-
-        for i, freq in enumerate(self._v_ppm[0]):
-            name = 'V' + str(i + 1)
-            widget = self._fields[name]
+        if (np.array_equal(_vars['v'], self._v_ppm)
+                and np.array_equal(_vars['j'], self._j)
+                and np.array_equal(_vars['w'], self._w_array)):
+            return
+        # The arrays are updated in place rather than replaced with the
+        # _vars arrays: widgets hold references to them, and replacing them
+        # would also alias the toolbar to the caller's (e.g. History's) data.
+        np.copyto(self._v_ppm, _vars['v'])
+        np.copyto(self._j, _vars['j'])
+        np.copyto(self._w_array, _vars['w'])
+        self._refresh_fields()
+
+    def _refresh_fields(self):
+        """Set the toolbar's widgets to the current frequency and peak width
+        values. Does not trigger the callback.
+
+        Unbuilt widgets are skipped: they read their initial values from the
+        arrays when they are built.
+        """
+        if not self._built:
+            return
+        for widget, freq in zip(self._v_fields, self._v_ppm[0]):
             widget.set_value(freq)
 
         width_widget = self._fields['W']
@@ -339,11 +420,14 @@ class SecondOrderSpinBar(SecondOrderBar):
 
         :param n: (int) The number of nuclei being simulated.
         """
+        kwargs = dict(self._spinbox_kwargs,
+                      array=self._v_ppm,
+                      callback=self._refresh)
         for freq in range(n):
-            vbox = ArraySpinBox(self, array=self._v_ppm, coord=(0, freq),
-                                name='V' + str(freq + 1),
-                                callback=self.callback,
-                                **self._spinbox_kwargs)
+            name = _V_NAMES[freq]
+            vbox = ArraySpinBox(self, coord=(0, freq), name=name, **kwargs)
+            self._fields[name] = vbox
+            self._v_fields.append(vbox)
             vbox.pack(side=LEFT)
 
     def _add_peakwidth_widget(self):
@@ -353,9 +437,10 @@ class SecondOrderSpinBar(SecondOrderBar):
         """
         wbox = ArraySpinBox(self, array=self._w_array, coord=(0, 0),
                             name="W",
-                            callback=self.callback,
+                            callback=self._refresh,
                             from_=0.01, to=100, increment=0.1,
                             realtime=self._spinbox_kwargs['realtime'])
+        self._fields['W'] = wbox
         wbox.pack(side=LEFT)
 
 
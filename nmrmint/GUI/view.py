@@ -5,9 +5,9 @@ Provides the following class:
 * View: an extension of tkinter.Frame that provides the main GUI.
 """
 
-# import sys  # Uncomment if debugging with trace_calls
-
-from tkinter import *
+from functools import partial
+from tkinter import (Button, Frame, Label, Tk, BOTH, E, LEFT, NO, RIDGE, SE,
+                     SUNKEN, TOP, W, X, Y, YES)
 
 from nmrmint.GUI.backends import MPLplot, save_as_eps, save_as_pdf
 from nmrmint.GUI.frames import RadioFrame
@@ -51,14 +51,16 @@ class View(Frame):
         """
         Frame.__init__(self, parent, **options)
 
-        # for debugging:
-        # sys.settrace(trace_calls)
-
         self._controller = controller
         self._nuclei_number = 2
         self.spectrometer_frequency = 300  # MHz
         self._v_min = -1  # ppm
         self._v_max = 12  # ppm
+        self._pending_plot_window = None  # Tk after() id for window update
+        self._last_fingerprint = None  # see update_current_plot
+        # True while several widgets are being changed at once, so that
+        # update_current_plot only runs once, afterwards:
+        self._suspend_refresh = False
 
         self._side_frame = Frame(self, relief=RIDGE, borderwidth=3)
         self._side_frame.pack(side=LEFT, expand=NO, fill=Y)
@@ -93,33 +95,44 @@ class View(Frame):
         self._first_order_bar = FirstOrderBar(**bar_kwargs)
 
     def _initialize_spinbars(self):
-        """Instantiate all of the toolbars used for the 'nspin' second-order
-        calculations, and store references to them.
+        """Set up SecondOrderSpinBar toolbars for the 'nspin' second-order
+        calculations, to be instantiated on first use by _get_spinbar.
         """
-        kwargs = {'callback': self.update_current_plot,
-                  'realtime': True}
-        spin_range = range(2, 9)  # hardcoded for only 2-8 spins
-        self._spinbars = [SecondOrderSpinBar(self._top_frame, n=spins, **kwargs)
-                          for spins in spin_range]
+        self._spinbar_class = SecondOrderSpinBar
+        self._spinbar_kwargs = {'callback': self.update_current_plot,
+                                'realtime': True}
+        self._spinbars = {}
 
     def _initialize_nospinbars(self):
-        """Instantiate all of the toolbars used for the 'nspin' second-order
-        calculations, and store references to them.
+        """Set up SecondOrderBar toolbars for the 'nspin' second-order
+        calculations, to be instantiated on first use by _get_spinbar.
         """
-        kwargs = {'callback': self.update_current_plot}
-        spin_range = range(2, 9)  # hardcoded for only 2-8 spins
-        self._spinbars = [SecondOrderBar(self._top_frame, n=spins, **kwargs)
-                          for spins in spin_range]
+        self._spinbar_class = SecondOrderBar
+        self._spinbar_kwargs = {'callback': self.update_current_plot}
+        self._spinbars = {}
+
+    def _get_spinbar(self, nspins):
+        """Return the second-order toolbar for a number of nuclei, creating
+        it if necessary.
+
+        :param nspins: (int) the number of nuclei (currently 2-8).
+        :return: the toolbar for nspins nuclei.
+        """
+        try:
+            return self._spinbars[nspins]
+        except KeyError:
+            toolbar = self._spinbar_class(self._top_frame, n=nspins,
+                                          **self._spinbar_kwargs)
+            self._spinbars[nspins] = toolbar
+            return toolbar
 
     def _add_calc_type_frame(self):
         """Add a menu for selecting the type of calculation to the upper left
         of the GUI.
         """
         title = 'Simulation'
-        buttons = (('First-Order',
-                    lambda: self._select_first_order()),
-                   ('Second-Order',
-                    lambda: self._select_second_order()))
+        buttons = (('First-Order', self._select_first_order),
+                   ('Second-Order', self._select_second_order))
 
         self._calc_type_frame = RadioFrame(self._side_frame,
                                            buttons=buttons, title=title,
@@ -130,31 +143,28 @@ class View(Frame):
         """Select the first-order calculation toolbar and deactivate the
         second-order "number of nuclei" entry.
         """
-        self._calc_type = 'first-order'
         self._select_toolbar(self._first_order_bar)
-        for child in self._nuc_number_frame.winfo_children():
-            child.configure(state='disable')
+        self._set_nuc_number_state('disable')
 
     def _select_second_order(self):
         """Select the second-order calculation toolbar corresponding to the
         current "number of nuclei" setting, and activate the "number of
         nuclei" entry.
         """
-        self._calc_type = 'second-order'
-        self._select_toolbar(self._spinbars[self._nuclei_number - 2])
-        for child in self._nuc_number_frame.winfo_children():
-            child.configure(state='normal')
+        self._select_toolbar(self._get_spinbar(self._nuclei_number))
+        self._set_nuc_number_state('normal')
 
     def _select_toolbar(self, toolbar):
         """Replaces the old toolbar with the new toolbar.
 
         :param toolbar: the toolbar to replace _currentbar in the GUI.
         """
-        self._currentbar.grid_remove()
-        self._currentbar = toolbar  # redundant with history.toolbar?
-        self._currentbar.grid(sticky=W)
-        # record current bar of currentframe:
-        self._active_bar_dict[self._calc_type] = toolbar
+        # Re-selecting the current bar (e.g. paging through second-order
+        # subspectra) doesn't need the widgets to be re-gridded.
+        if toolbar is not self._currentbar:
+            self._currentbar.grid_remove()
+            self._currentbar = toolbar  # redundant with history.toolbar?
+            self._currentbar.grid(sticky=W)
         history.change_toolbar(self._currentbar)
         self.update_current_plot()
 
@@ -168,16 +178,27 @@ class View(Frame):
             value=self._nuclei_number,
             callback=self._set_nuc_number)
         self._nuc_number_frame.pack(side=TOP)
-        for child in self._nuc_number_frame.winfo_children():
-            child.configure(state='disable')
+        self._nuc_number_children = self._nuc_number_frame.winfo_children()
+        self._nuc_number_state = None
+        self._set_nuc_number_state('disable')
+
+    def _set_nuc_number_state(self, state):
+        """Enable or disable the "number of nuclei" entry's widgets.
+
+        :param state: (str) 'normal' or 'disable'
+        """
+        if state == self._nuc_number_state:
+            return
+        self._nuc_number_state = state
+        for child in self._nuc_number_children:
+            child.configure(state=state)
 
     def _set_nuc_number(self):
         """Set the nuclei number based on the "number of nuclei" entry,
         and activate the corresponding toolbar.
         """
         self._nuclei_number = self._nuc_number_frame.current_value
-        # _nuclei_number[0] is the toolbar for 2 spins, 1 for 3, etc. so:
-        self._select_toolbar(self._spinbars[self._nuclei_number - 2])
+        self._select_toolbar(self._get_spinbar(self._nuclei_number))
 
     def _add_specfreq_frame(self):
         """Add the entries for spectrometer frequency and min/max chemical
@@ -215,8 +236,7 @@ class View(Frame):
 
         self.clear_current()
         self.plot_current(*history.current_lineshape())
-        self.clear_total()
-        self.plot_total(*history.total_lineshape())
+        self._refresh_total_plot()
 
     def _add_minmax_entries(self):
         """Add entries for minimum and maximum frequency to display."""
@@ -237,11 +257,26 @@ class View(Frame):
     def _set_v_min(self):
         """Set the minimum ppm limit for the total plot."""
         self._v_min = self._v_min_frame.current_value
-        self.canvas.set_total_plot_window(self._v_min, self._v_max)
+        self._schedule_plot_window()
 
     def _set_v_max(self):
         """Set the maximum ppm limit for the total plot."""
         self._v_max = self._v_max_frame.current_value
+        self._schedule_plot_window()
+
+    def _schedule_plot_window(self):
+        """Schedule an update of the total plot's ppm limits.
+
+        Changes arriving within 40 ms of each other (e.g. editing both v min
+        and v max) are coalesced into a single redraw, using the most recent
+        limits.
+        """
+        if self._pending_plot_window is None:
+            self._pending_plot_window = self.after(40, self._set_plot_window)
+
+    def _set_plot_window(self):
+        """Apply the current ppm limits to the total plot."""
+        self._pending_plot_window = None
         self.canvas.set_total_plot_window(self._v_min, self._v_max)
 
     def _add_filesave_frame(self):
@@ -256,9 +291,9 @@ class View(Frame):
     def _add_filesave_buttons(self):
         """Add buttons for saving the total spectrum as EPS or PDF."""
         save_eps_button = Button(self.filesave_frame, text="Save as EPS",
-                                 command=lambda: self._save_as_eps())
+                                 command=self._save_as_eps)
         save_pdf_button = Button(self.filesave_frame, text="Save as PDF",
-                                 command=lambda: self._save_as_pdf())
+                                 command=self._save_as_pdf)
         save_pdf_button.pack()
         save_eps_button.pack()
 
@@ -285,10 +320,8 @@ class View(Frame):
         """Add buttons to select the EPS orientation."""
         # Seems that this feature isn't available for PDF in matplotlib?
         title = 'EPS Orientation'
-        buttons = (('Landscape',
-                    lambda: self._set_orientation(True)),
-                   ('Portrait',
-                    lambda: self._set_orientation(False)))
+        buttons = (('Landscape', partial(self._set_orientation, True)),
+                   ('Portrait', partial(self._set_orientation, False)))
 
         self._orientation_frame = RadioFrame(self.filesave_frame,
                                              buttons=buttons, title=title,
@@ -336,14 +369,14 @@ class View(Frame):
             self._subspectrum_button_frame,
             text="Add to Spectrum",
             highlightbackground='red',
-            command=lambda: self._toggle_subspectrum())
+            command=self._toggle_subspectrum)
         new_subspectrum_button = Button(self._subspectrum_button_frame,
                                         text="New Subspectrum",
-                                        command=lambda: self._new_subspectrum())
+                                        command=self._new_subspectrum)
         delete_subspectrum_button = Button(
             self._subspectrum_button_frame,
             text="Delete Subspectrum",
-            command=lambda: self._delete_subspectrum())
+            command=self._delete_subspectrum)
 
         self._add_subspectrum_button.grid(row=1, column=0)
         new_subspectrum_button.grid(row=1, column=1)
@@ -365,8 +398,16 @@ class View(Frame):
             self._add_subspectrum_button['highlightbackground'] = 'red'
             history.remove_current_from_total()
 
-        self.clear_total()
-        self.plot_total(*history.total_lineshape())
+        self._refresh_total_plot()
+
+    def _refresh_total_plot(self):
+        """Redraw the total spectrum plot from history's total lineshape.
+
+        Used after history has updated the total spectrum in place (e.g. by
+        adding/removing the current subspectrum), so, unlike plot_total,
+        the lineshape is not saved back to history.
+        """
+        self.canvas.plot_total(history.total_x, history.total_y)
 
     def _reset_active_button_color(self):
         """Set the color of the "Add to Spectrum" button according to the
@@ -410,7 +451,11 @@ class View(Frame):
         #  a click. Refactor out?
         # Want to switch to default 1st order bar, and to change radio
         # button, so easy way is to:
-        self._calc_type_frame.click(0)
+        self._suspend_refresh = True
+        try:
+            self._calc_type_frame.click(0)
+        finally:
+            self._suspend_refresh = False
 
         # update history and subspectrum with its status
         history.change_toolbar(self._currentbar)
@@ -420,7 +465,13 @@ class View(Frame):
     def _refresh_current_GUI(self):
         """Refresh GUI widgets and current subspectrum plot to match current
         subspectrum."""
-        self._refresh_GUI_widgets()
+        # Resetting the widgets can select toolbars, which would otherwise
+        # update the current plot each time.
+        self._suspend_refresh = True
+        try:
+            self._refresh_GUI_widgets()
+        finally:
+            self._suspend_refresh = False
         self.update_current_plot()
 
     def _refresh_GUI_widgets(self):
@@ -449,22 +500,21 @@ class View(Frame):
         """
         if history.delete():
             self._refresh_current_GUI()
-            self.clear_total()
-            self.plot_total(*history.total_lineshape())
+            self._refresh_total_plot()
 
     def _add_subspectrum_navigation(self):
         """Add subspectrum navigation tools to the GUI."""
         subspectrum_back = Button(
             self._subspectrum_button_frame,
             text="<-",
-            command=lambda: self._prev_subspectrum())
+            command=self._prev_subspectrum)
         self._subspectrum_label = Label(
             self._subspectrum_button_frame,
             text="Subspectrum " + str(history.current + 1))
         subspectrum_forward = Button(
             self._subspectrum_button_frame,
             text="->",
-            command=lambda: self._next_subspectrum())
+            command=self._next_subspectrum)
         subspectrum_back.grid(row=0, column=0, sticky=E)
         self._subspectrum_label.grid(row=0, column=1)
         subspectrum_forward.grid(row=0, column=2, sticky=W)
@@ -489,14 +539,11 @@ class View(Frame):
         self.canvas._tkcanvas.pack(anchor=SE, expand=YES, fill=BOTH)
 
     def _initialize_active_bars(self):
-        """Initialize the GUI and history with the default toolbars for first
-       and second
-       order.
-       """
+        """Initialize the GUI and history with the default (first-order)
+        toolbar.
+        """
         self._currentbar = self._first_order_bar
         self._currentbar.grid(sticky=W)
-        self._active_bar_dict = {'first-order': self._first_order_bar,
-                                 'second-order': self._spinbars[0]}
         history.change_toolbar(self._currentbar)
 
     #########################################################################
@@ -511,20 +558,31 @@ class View(Frame):
         doing too many things. May be solved when history is refactored into
         Controller and out of View.
         """
+        if self._suspend_refresh:
+            return
+        history.save()
+        model, vars_ = history.subspectrum_data()
+
+        # Skip recalculation if nothing that affects the current plot has
+        # changed since the last call (e.g. an entry committed unchanged).
+        subspectrum = history.current_subspectrum()
+        fingerprint = (subspectrum, model, subspectrum.vars_key(),
+                       self.spectrometer_frequency)
+        if fingerprint == self._last_fingerprint:
+            return
+        self._last_fingerprint = fingerprint
+
         # Remove old current plot from total plot if necessary
         # TODO: maybe change to a Subspectrum.deactivate() method?
         active = history.current_subspectrum().active
         if active:
             history.remove_current_from_total()
 
-        history.save()
-        model, vars_ = history.subspectrum_data()
         self._controller.update_current_plot(model, vars_)
 
         if active:
             history.add_current_to_total()
-            self.clear_total()
-            self.plot_total(*history.total_lineshape())
+            self._refresh_total_plot()
 
     def clear_current(self):
         """Erase the current (top) spectrum plot."""
@@ -554,45 +612,11 @@ class View(Frame):
         history.save_total_lineshape(x, y)
         self.canvas.plot_total(x, y)
 
-# Debugging routines:
-
-
-# following is taken from PyMOTW: https://pymotw.com/2/sys/tracing.html
-def trace_calls(frame, event, arg):
-    if arg:
-        print('arg passed to trace_calls')  # need to recheck why arg is needed
-    if event != 'call':
-        return
-    co = frame.f_code
-    func_name = co.co_name
-    if func_name == 'write':
-        # Ignore write() calls from print statements
-        return
-    func_line_no = frame.f_lineno
-    func_filename = co.co_filename
-
-    if "/Volumes/GoogleDrive/My Drive/Programming/NMR code/nmrmint" not in \
-            func_filename:
-        return
-
-    # use conditionals below to narrow focus
-    if "widgets.py" not in func_filename:
-        return
-
-    if func_name != "_on_return":
-        return
-
-    caller = frame.f_back
-    caller_line_no = caller.f_lineno
-    caller_filename = caller.f_code.co_filename
-    print('Call to %s on line %s of %s from line %s of %s' %
-          (func_name, func_line_no, func_filename,
-           caller_line_no, caller_filename))
-    return
-
 
 if __name__ == '__main__':
-    # sys.settrace(trace_calls)  # for debugging
+    # for debugging, set the NMRMINT_TRACE environment variable:
+    from nmrmint.GUI._debug import install_trace
+    install_trace()
 
     # Create the main application window:
     from nmrmint.controller import controller
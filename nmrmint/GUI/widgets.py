@@ -32,7 +32,8 @@ and defaults to the custom minimum value when empty.
 # TODO: keep implementing composition over inheritance for customizing widgets
 # TODO: better names, e.g. VarBox, SimpleVariableBox
 
-from tkinter import *
+from tkinter import (Button, Entry, Frame, Label, Spinbox, StringVar, Tk,
+                     END, LEFT, NSEW, RIDGE, TOP, X, Y)
 
 up_arrow = u"\u21e7"
 down_arrow = u"\u21e9"
@@ -125,8 +126,8 @@ class _BaseEntryFrame(Frame):
         outside the widget.
         Subclasses may overwrite/extend _bind_entry to tailor behavior.
         """
-        self._entry.bind('<Return>', lambda event: self._on_return(event))
-        self._entry.bind('<Tab>', lambda event: self._on_tab(event))
+        self._entry.bind('<Return>', self._on_return)
+        self._entry.bind('<Tab>', self._on_tab)
         self._entry.bind('<FocusOut>', lambda event: self._refresh())
         self._entry.bind('<FocusIn>',
                          lambda event: self._entry.select_range(0, END))
@@ -323,8 +324,8 @@ class ArraySpinBox(ArrayBox):
         """Extend the ArrayFrame method to include bindings for mouse button
         press/release.
         """
-        self._entry.bind('<Return>', lambda event: self._on_return(event))
-        self._entry.bind('<Tab>', lambda event: self._on_tab(event))
+        self._entry.bind('<Return>', self._on_return)
+        self._entry.bind('<Tab>', self._on_tab)
         self._entry.bind('<FocusOut>', lambda event: self._refresh())
         self._entry.bind('<FocusIn>',
                          lambda event: self._entry.selection('range', 0, END))
@@ -457,10 +458,8 @@ class VarButtonBox(VarBox):
                                         weight=1)  # lets arrow buttons fill
         increment_frame.pack(side=TOP, expand=Y, fill=X)
 
-        minus = Button(increment_frame, text='-',
-                       command=lambda: self.decrease())
-        plus = Button(increment_frame, text='+',
-                      command=lambda: self.increase())
+        minus = Button(increment_frame, text='-', command=self.decrease)
+        plus = Button(increment_frame, text='+', command=self.increase)
         up = Button(increment_frame, text=up_arrow, command=lambda: None)
         up.bind('<Button-1>', lambda event: self.zoom_up())
         up.bind('<ButtonRelease-1>', lambda event: self.stop_action())
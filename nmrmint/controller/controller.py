@@ -14,11 +14,22 @@ Provides the following class:
 # TODO: simplify toolbar/widget APIs and transfer data management
 # responsibilities here.
 
+import logging
 import tkinter as tk
+from collections import OrderedDict
+
+import numpy as np
 
 from nmrmint.GUI.view import View
 from nmrmint.model.nmrmath import (nspinspec, first_order)
-from nmrmint.model.nmrplot import tkplot
+from nmrmint.model.nmrplot import add_signals, tkplot_linspace
+
+logger = logging.getLogger(__name__)
+
+# Each cached lineshape holds a 160000-point y array (~1.3 MB), so only
+# enough are kept for the subspectra of a typical session plus a few recent
+# edits.
+_LINESHAPE_CACHE_SIZE = 16
 
 
 class Controller:
@@ -48,6 +59,9 @@ class Controller:
             root: a tkinter.Tk() object
         """
         self.counter = 0  # for debugging
+        self._lineshapes = OrderedDict()  # see _cached_lineshape
+        self._x_grids = {}  # see _x_grid
+        self._scratch = None  # see _shared_grid_lineshape
         self.models = {'first_order': first_order,
                        'nspin': self._call_nspins_model}
         self.view = View(root, self)
@@ -60,23 +74,12 @@ class Controller:
         self.view.plot_total(*self.blank_total_spectrum())
 
         self.view.update_current_plot()
-        # sys.settrace(self.update_current_plot)
 
     # Model uses frequencies in Hz, but desired View plots are in ppm.
-    # The following methods convert frequency domains for lineshapes (defined
-    #  with an x, y tuple of numpy ndarrays) and spectra (defined as lists of
+    # Lineshapes (defined with an x, y tuple of numpy ndarrays) are plotted
+    # against x grids converted once per spectrometer frequency (see _x_grid).
+    # The following method converts spectra (defined as lists of
     # (frequency, intensity) tuples).
-    def _lineshape_to_ppm(self, plotdata):
-        """Convert a lineshape (an x, y tuple of arrays) from x in units of
-        Hz to x in units of ppm.
-
-        Assumes access to self.view.spectrometer_frequency.
-        :param plotdata: (numpy array, numpy array) the lineshape to be
-        converted."""
-        x, y = plotdata
-        x = x / self.view.spectrometer_frequency
-        return x, y
-
     def _spectrum_from_ppm(self, spectrum):
         """Convert a spectrum (a list of (frequency, intensity) tuples) from
         frequencies in ppm to frequencies in Hz.
@@ -103,13 +106,13 @@ class Controller:
         (frequency, intensity) tuples
         """
         if not (v.any() and j.any() and w.any()):
-            print('invalid kwargs:')
+            logger.warning('invalid kwargs:')
             if not v.any():
-                print('v missing')
+                logger.warning('v missing')
             if not j.any():
-                print('j missing')
+                logger.warning('j missing')
             if not w.any():
-                print('w missing')
+                logger.warning('w missing')
         else:
             return nspinspec(v, j), w
 
@@ -157,36 +160,105 @@ class Controller:
             'j': vars_['j'],
             'w': vars_['w'][0, 0]}
 
-    def _first_order_spectrum(self, vars_):
-        """Return a (spectrum, line width) tuple for use in calculating a
-        lineshape for a first-order model.
+    def _x_grid(self, spectrometer_frequency):
+        """Return the x coordinates shared by all lineshapes at a
+        spectrometer frequency, in both Hz and ppm.
+
+        Only the grids for the most recent frequency are kept. The arrays
+        are shared, so they are returned read-only.
 
-        :param vars_: {} where 'JnX' and 'width' keys are floats and '#n'
-        keys are ints.
-        :return: a spectrum, w tuple where:
-            spectrum: [(float, float)...] of frequency (Hz), intensity tuples
+        :param spectrometer_frequency: (float)
+        :return: (numpy ndarray, numpy ndarray) of x in Hz, x in ppm.
+        """
+        try:
+            return self._x_grids[spectrometer_frequency]
+        except KeyError:
+            x_hz = tkplot_linspace(spectrometer_frequency)
+            x_ppm = x_hz / spectrometer_frequency
+            x_hz.flags.writeable = False
+            x_ppm.flags.writeable = False
+            self._x_grids = {spectrometer_frequency: (x_hz, x_ppm)}
+            return x_hz, x_ppm
+
+    def _cached_lineshape(self, key, calculate, *args):
+        """Return lineshape data from the controller's cache, calculating and
+        storing it first if necessary.
+
+        The least recently used lineshapes are dropped once the cache holds
+        _LINESHAPE_CACHE_SIZE of them. Cached arrays may be shared between
+        subspectra, so they must be read-only.
+
+        :param key: a hashable key identifying the lineshape, including the
+        model and the spectrometer frequency.
+        :param calculate: the function returning the lineshape data.
+        :param args: the arguments for calculate.
+        :return: (numpy ndarray, numpy ndarray) tuple of x, y lineshape data.
+        """
+        try:
+            self._lineshapes.move_to_end(key)
+            return self._lineshapes[key]
+        except KeyError:
+            lineshape = calculate(*args)
+            self._lineshapes[key] = lineshape
+            if len(self._lineshapes) > _LINESHAPE_CACHE_SIZE:
+                self._lineshapes.popitem(last=False)
+            return lineshape
+
+    def _first_order_lineshape(self, signal, couplings, w,
+                               spectrometer_frequency):
+        """Return lineshape data for a first-order multiplet.
+
+        The returned arrays are read-only, so that they can be cached (see
+        _cached_lineshape).
+
+        :param signal: (float, float) of frequency (Hz), intensity
+        :param couplings: ((float, int)...) of J, #nuclei
+        :param w: (float) peak width in Hz
+        :param spectrometer_frequency: (float) should match
+        self.view.spectrometer_frequency.
+        :return: (numpy ndarray, numpy ndarray) tuple of x, y lineshape data.
         """
-        data = self._convert_first_order(vars_)
-        signal = data['signal']
-        couplings = data['couplings']
-        w = data['w']
         spectrum = self.models['first_order'](signal=signal,
-                                              couplings=couplings)
-        return spectrum, w
+                                              couplings=list(couplings))
+        return self._shared_grid_lineshape(spectrum, w, spectrometer_frequency)
 
-    def _second_order_spectrum(self, vars_):
-        """Return a (spectrum, line width) tuple for use in calculating a
-        lineshape for a second-order model.
+    def _second_order_lineshape(self, v, j, w, spectrometer_frequency):
+        """Return lineshape data for a second-order spin system.
 
-        :param vars_: {'v': [[float...]] of chemical shifts in ppm;
-                       'j': (2d numpy ndarray) of coupling constants in Hz;
-                       'w': [[(float)]] for peak width in Hz}
-        :return: a spectrum, w tuple where:
-            spectrum: [(float, float)...] of frequency (Hz), intensity tuples
+        The returned arrays are read-only, so that they can be cached (see
+        _cached_lineshape).
+
+        :param v: (float...) of chemical shifts in Hz
+        :param j: ((float...)...) rows of the J matrix, in Hz
+        :param w: (float) peak width in Hz
+        :param spectrometer_frequency: (float) should match
+        self.view.spectrometer_frequency.
+        :return: (numpy ndarray, numpy ndarray) tuple of x, y lineshape data.
         """
-        data = self._convert_second_order(vars_)
-        spectrum, w = self.models['nspin'](**data)
-        return spectrum, w
+        spectrum, w = self.models['nspin'](v=np.array(v), j=np.array(j),
+                                           w=np.float64(w))
+        return self._shared_grid_lineshape(spectrum, w, spectrometer_frequency)
+
+    def _shared_grid_lineshape(self, spectrum, w, spectrometer_frequency):
+        """Return lineshape data for a spectrum, using the x coordinates
+        shared by all lineshapes at the spectrometer frequency.
+
+        Equivalent to tkplot with x then converted to ppm, but without
+        recreating the x coordinates for every lineshape.
+
+        :param spectrum: [(float, float)...] of frequency (Hz), intensity
+        :param w: (float) peak width in Hz
+        :param spectrometer_frequency: (float)
+        :return: (numpy ndarray, numpy ndarray) tuple of read-only x (ppm),
+        y lineshape data.
+        """
+        x_hz, x_ppm = self._x_grid(spectrometer_frequency)
+        # add_signals' scratch array is reused between lineshapes.
+        if self._scratch is None or self._scratch.shape != x_hz.shape:
+            self._scratch = np.empty_like(x_hz)
+        y = add_signals(x_hz, spectrum, w, scratch=self._scratch)
+        y.flags.writeable = False
+        return x_ppm, y
 
     #########################################################################
     # Methods below provide the interface to the view
@@ -216,18 +288,22 @@ class Controller:
         :return: (numpy ndarray, numpy ndarray) tuple of x, y lineshape data.
         """
         if model == 'first_order':
-            spectrum, w = self._first_order_spectrum(vars_)
+            data = self._convert_first_order(vars_)
+            args = (data['signal'], tuple(data['couplings']), data['w'],
+                    self.view.spectrometer_frequency)
+            return self._cached_lineshape((model,) + args,
+                                          self._first_order_lineshape, *args)
         elif model == 'nspin':
-            spectrum, w = self._second_order_spectrum(vars_)
+            data = self._convert_second_order(vars_)
+            args = (tuple(data['v']),
+                    tuple(map(tuple, np.asarray(data['j']))),
+                    data['w'], self.view.spectrometer_frequency)
+            return self._cached_lineshape((model,) + args,
+                                          self._second_order_lineshape, *args)
         else:
-            print('model not recognized')
+            logger.warning('model not recognized: %s', model)
             return None
 
-        plotdata = tkplot(
-            spectrum, w,
-            spectrometer_frequency=self.view.spectrometer_frequency)
-        return self._lineshape_to_ppm(plotdata)
-
     def blank_total_spectrum(self):
         """Return lineshape data for a blank total spectrum with a 0.05H TMS
         peak at 0 ppm.
@@ -237,11 +313,13 @@ class Controller:
         # Initial/blank spectra will have a "TMS" peak at 0 that integrates
         # to 0.05 H.
         self.blank_spectrum = [(0, 0.05)]
-        plotdata = tkplot(
-            self.blank_spectrum,
-            spectrometer_frequency=self.view.spectrometer_frequency)
-        plotdata = self._lineshape_to_ppm(plotdata)
-        return plotdata
+        freq = self.view.spectrometer_frequency
+        x, y = self._cached_lineshape(('blank', freq),
+                                      self._shared_grid_lineshape,
+                                      self.blank_spectrum, 0.5, freq)
+        # The total spectrum is built up by in-place addition to y, so the
+        # cached y is copied.
+        return x, y.copy()
 
 
 if __name__ == '__main__':
@@ -9,7 +9,7 @@ import numpy as np
 from math import sqrt
 
 from scipy.linalg import eigh
-from scipy.sparse import kron, csc_matrix, csr_matrix, lil_matrix, bmat
+from scipy.sparse import kron, csr_matrix, bmat
 
 ##############################################################################
 # Second-order, Quantum Mechanics routines
@@ -55,15 +55,12 @@ def transition_matrix(n):
     :returns: a transition matrix that can be used to compute the intensity of
     allowed transitions.
     """
-    # function was optimized by only calculating upper triangle and then adding
-    # the lower.
-    T = lil_matrix((n, n))  # sparse matrix created
-    for i in range(n - 1):
-        for j in range(i + 1, n):
-            if is_allowed(i, j):
-                T[i, j] = 1
-    T = T + T.T
-    return T
+    # Vectorized version of is_allowed over all (i, j) pairs: a transition
+    # is allowed if i XOR j has exactly one bit set, i.e. is a power of two.
+    states = np.arange(n)
+    flipped = states[:, np.newaxis] ^ states
+    allowed = (flipped != 0) & ((flipped & (flipped - 1)) == 0)
+    return csr_matrix(allowed.astype(float))
 
 
 def hamiltonian(freqlist, couplings):
@@ -74,55 +71,47 @@ def hamiltonian(freqlist, couplings):
         :param couplings: an n x n array of coupling constants in Hz
     Returns: a Hamiltonian array
     """
+    # Rather than building the Cartesian spin operators with Kronecker
+    # products and summing their products, the matrix elements are filled in
+    # directly from the binary codes of the spin states (see popcount and
+    # is_allowed). Spin n is coded by bit (nspins - 1 - n) of the state
+    # index, with 0 = alpha (Iz = +1/2) and 1 = beta (Iz = -1/2), matching
+    # the ordering of the Kronecker product version.
     nspins = len(freqlist)
+    freqs = np.asarray(freqlist, dtype=float).ravel()
+    J = np.asarray(couplings, dtype=float)
 
-    # Define Pauli matrices
-    sigma_x = np.matrix([[0, 1 / 2], [1 / 2, 0]])
-    sigma_y = np.matrix([[0, -1j / 2], [1j / 2, 0]])
-    sigma_z = np.matrix([[1 / 2, 0], [0, -1 / 2]])
-    unit = np.matrix([[1, 0], [0, 1]])
+    # Testing with MATLAB discovered J must be /2.
+    # Believe it is related to the fact that in the SpinDynamics.org simulation
+    # freqs are *2pi, but Js by pi only.
+    scalars = 0.5 * J
 
-    # The following empty arrays will be used to store the
-    # Cartesian spin operators.
-    Lx = np.empty((1, nspins), dtype='object')
-    Ly = np.empty((1, nspins), dtype='object')
-    Lz = np.empty((1, nspins), dtype='object')
+    states = np.arange(2 ** nspins)
+    bit_positions = nspins - 1 - np.arange(nspins)
+    bits = (states[:, np.newaxis] >> bit_positions) & 1
+    Iz = 0.5 - bits
 
-    for n in range(nspins):
-        Lx[0, n] = 1
-        Ly[0, n] = 1
-        Lz[0, n] = 1
-        for k in range(nspins):
-            if k == n:                                  # Diagonal element
-                Lx[0, n] = np.kron(Lx[0, n], sigma_x)
-                Ly[0, n] = np.kron(Ly[0, n], sigma_y)
-                Lz[0, n] = np.kron(Lz[0, n], sigma_z)
-            else:                                       # Off-diagonal element
-                Lx[0, n] = np.kron(Lx[0, n], unit)
-                Ly[0, n] = np.kron(Ly[0, n], unit)
-                Lz[0, n] = np.kron(Lz[0, n], unit)
-
-    Lcol = np.vstack((Lx, Ly, Lz)).real
-    Lrow = Lcol.T  # As opposed to sparse version of code, this works!
-    Lproduct = np.dot(Lrow, Lcol)
-
-    # Hamiltonian operator
-    H = np.zeros((2**nspins, 2**nspins))
-
-    # Add Zeeman interactions:
-    for n in range(nspins):
-        H = H + freqlist[n] * Lz[0, n]
+    H = np.zeros((2 ** nspins, 2 ** nspins))
 
-    # Scalar couplings
+    # Zeeman interactions, the Iz*Iz part of the scalar couplings, and the
+    # I.I = 3/4 self-terms are all diagonal:
+    diagonal = Iz.dot(freqs)
+    diagonal += np.einsum('sn,nk,sk->s', Iz, scalars, Iz)
+    diagonal += 0.5 * np.trace(scalars)
+    H[states, states] = diagonal
 
-    # Testing with MATLAB discovered J must be /2.
-    # Believe it is related to the fact that in the SpinDynamics.org simulation
-    # freqs are *2pi, but Js by pi only.
-    scalars = 0.5 * couplings
-    scalars = np.multiply(scalars, Lproduct)
+    # The Ix*Ix + Iy*Iy part of the scalar couplings is the flip-flop term,
+    # which connects states where spins n and k are antiparallel to the state
+    # with both spins flipped.
     for n in range(nspins):
-        for k in range(nspins):
-            H += scalars[n, k].real
+        for k in range(n + 1, nspins):
+            coupling = 0.5 * (scalars[n, k] + scalars[k, n])
+            if coupling == 0:
+                continue
+            antiparallel = states[bits[:, n] != bits[:, k]]
+            flipped = antiparallel ^ ((1 << bit_positions[n]) |
+                                      (1 << bit_positions[k]))
+            H[antiparallel, flipped] += coupling
 
     return H
 
@@ -137,10 +126,9 @@ def simsignals(H, nspins):
     :return spectrum: a list of (frequency, intensity) tuples.
     """
     # This routine was optimized for speed by vectorizing the intensity
-    # calculations, replacing a nested-for signal-by-signal calculation.
-    # Considering that hamiltonian was dramatically faster when refactored to
-    # use arrays instead of sparse matrices, consider an array refactor to this
-    # function as well.
+    # calculations and the extraction of signals, replacing nested-for
+    # signal-by-signal calculations. Eigenvectors are kept as dense arrays;
+    # only the transition matrix is sparse.
 
     # The eigensolution calculation apparently must be done on a dense matrix,
     # because eig functions on sparse matrices can't return all answers?!
@@ -149,23 +137,22 @@ def simsignals(H, nspins):
     E, V = np.linalg.eigh(H)    # V will be eigenvectors, v will be frequencies
 
     # Eigh still leaves residual 0j terms, so:
-    V = np.asmatrix(V.real)
+    V = V.real
 
     # Calculate signal intensities
-    Vcol = csc_matrix(V)
-    Vrow = csr_matrix(Vcol.T)
     m = 2 ** nspins
     T = transition_matrix(m)
-    I = Vrow * T * Vcol
-    I = np.square(I.todense())
-
-    spectrum = []
-    for i in range(m - 1):
-        for j in range(i + 1, m):
-            if I[i, j] > 0.01:  # consider making this minimum intensity
-                                # cutoff a function arg, for flexibility
-                v = abs(E[i] - E[j])
-                spectrum.append((v, I[i, j]))
+    I = np.square(V.T @ (T @ V))
+
+    # Signals are the upper-triangle (i < j) transitions above a minimum
+    # intensity, in the same row-major order as a nested i, j loop.
+    i, j = np.triu_indices(m, 1)
+    intensities = I[i, j]
+    # consider making this minimum intensity cutoff a function arg, for
+    # flexibility
+    signal = intensities > 0.01
+    frequencies = np.abs(E[i[signal]] - E[j[signal]])
+    spectrum = list(zip(frequencies, intensities[signal]))
 
     return spectrum
 
@@ -29,7 +29,7 @@ def lorentz(v, v0, I, w):
             (0.5 * w) ** 2 / ((0.5 * w) ** 2 + (v - v0) ** 2))
 
 
-def add_signals(linspace, peaklist, w):
+def add_signals(linspace, peaklist, w, scratch=None):
     """
     Given a numpy linspace, a spectrum as a list of (frequency, intensity)
     tuples, and a linewidth, returns an array of y coordinates for the
@@ -38,11 +38,26 @@ def add_signals(linspace, peaklist, w):
     :param linspace: a numpy linspace of x coordinates for the lineshape.
     :param peaklist: a list of (frequency, intensity) tuples
     :param w: peak width at half maximum intensity
+    :param scratch: (optional) an array with the shape and dtype of
+    linspace, which is overwritten with intermediate values. Callers making
+    repeated calls can pass the same array each time; if None, one is
+    allocated.
     :returns: array of y coordinates for the lineshape
     """
-    result = lorentz(linspace, peaklist[0][0], peaklist[0][1], w)
-    for v, i in peaklist[1:]:
-        result += lorentz(linspace, v, i, w)
+    # Equivalent to summing lorentz() for each peak, with the same
+    # arithmetic, but each peak is evaluated in place in a scratch array
+    # instead of allocating several temporary arrays per peak.
+    scaling_factor = 0.5 / w
+    half_width_squared = (0.5 * w) ** 2
+    result = np.zeros_like(linspace)
+    peak = np.empty_like(linspace) if scratch is None else scratch
+    for v, i in peaklist:
+        np.subtract(linspace, v, out=peak)
+        np.square(peak, out=peak)
+        peak += half_width_squared
+        np.divide(half_width_squared, peak, out=peak)
+        peak *= scaling_factor * i
+        result += peak
     return result
 
 
@@ -91,20 +106,65 @@ def nmrplot(spectrum, y=1):
 #     return x, y
 
 
+def decimate(x, y, xlim, bins):
+    """Reduce x, y data to what can be seen in an x range at a given
+    horizontal resolution.
+
+    Points outside xlim are dropped, and the rest are split into bins; only
+    the minimum and maximum of each bin are kept (once, if they are the
+    same point), in their original order, so peak heights are preserved.
+
+    :param x: (numpy ndarray) x coordinates, in ascending order.
+    :param y: (numpy ndarray)
+    :param xlim: (float, float) the x range, in either order.
+    :param bins: (int) the number of horizontal bins (e.g. pixels).
+    :return: (numpy ndarray, numpy ndarray) the decimated x, y data.
+    """
+    start, stop = np.searchsorted(x, sorted(xlim))
+    # keep one point past each limit so the line reaches the axes edges
+    start = max(start - 1, 0)
+    stop = min(stop + 1, len(x))
+    x, y = x[start:stop], y[start:stop]
+    bins = max(int(bins), 1)
+    points_per_bin = len(x) // bins
+    if points_per_bin < 3:
+        return x, y
+    end = points_per_bin * bins
+    binned_y = y[:end].reshape(bins, points_per_bin)
+    extrema = np.column_stack((binned_y.argmin(axis=1),
+                               binned_y.argmax(axis=1)))
+    extrema.sort(axis=1)
+    extrema += np.arange(0, end, points_per_bin)[:, np.newaxis]
+    distinct = np.ones(extrema.shape, dtype=bool)
+    distinct[:, 1] = extrema[:, 1] != extrema[:, 0]
+    indices = np.concatenate((extrema[distinct], np.arange(end, len(x))))
+    return x[indices], y[indices]
+
+
+def tkplot_linspace(spectrometer_frequency=300):
+    """Return the linspace of x coordinates (in Hz) used by tkplot.
+
+    Hard-coding a -1 to 15 ppm linspace, with resolution such that a 1 GHz
+    spectrometer has 10 points per Hz.
+    :param spectrometer_frequency: the frequency of the spectrometer (i.e
+    frequency in MHz that 1H nuclei resonate at)
+    :return: a numpy.ndarray of x coordinates"""
+    return np.linspace(-1 * spectrometer_frequency,
+                       15 * spectrometer_frequency,
+                       160000)  # 0.01 Hz resolution on 1 GHz spectrometer
+
+
 def tkplot(spectrum, w=0.5, spectrometer_frequency=300):
     """Generate linspaces of x and y coordinates suitable for plotting on a
     matplotlib tkinter current_canvas.
 
-    Hard-coding a -1 to 15 ppm linspace, with resolution such that a 1 GHz
-    spectrometer has 10 points per Hz.
+    See tkplot_linspace for the x coordinates used.
     :param spectrum: A list of (frequency, intensity) tuples
     :param w: peak width at half height
     :param spectrometer_frequency: the frequency of the spectrometer (i.e
     frequency in MHz that 1H nuclei resonate at)
     :return: a tuple of x and y numpy.ndarrays"""
-    x = np.linspace(-1 * spectrometer_frequency,
-                    15 * spectrometer_frequency,
-                    160000)  # 0.01 Hz resolution on 1 GHz spectrometer
+    x = tkplot_linspace(spectrometer_frequency)
     y = add_signals(x, spectrum, w)
     return x, y
 
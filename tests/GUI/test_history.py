@@ -429,22 +429,21 @@ def test_save(vars_default):
     assert ss.toolbar is history._toolbar
 
 
-def test_save_alerts_if_no_toolbar(capsys):
+def test_save_alerts_if_no_toolbar(caplog):
     """Test that history.save gracefully handles having no history.toolbar.
 
     Only expect this scenario to occur during tests, not in working code.
     """
     # GIVEN a History instance with no toolbar recorded
     history = History()
-    # noinspection PyUnusedLocal
-    out, err = capsys.readouterr()  # capture any print statements before save
+    caplog.clear()  # ignore any messages logged before save
 
     # WHEN told to save toolbar state
     history.save()
 
-    # THEN a helpful error message is printed
-    out, err = capsys.readouterr()
-    assert out.startswith("HISTORY TOOLBAR ERROR")
+    # THEN a helpful error message is logged
+    assert caplog.records[-1].levelname == 'ERROR'
+    assert caplog.records[-1].getMessage().startswith("HISTORY TOOLBAR ERROR")
 
 
 def test_restore(ss1):
@@ -17,3 +17,19 @@ def test_subspectrum_toggle_false():
     assert ss.active
     ss.toggle_active()
     assert not ss.active
+
+
+def test_vars_key_reset_when_vars_replaced():
+    # GIVEN a subspectrum whose vars key has been computed
+    ss = Subspectrum(vars_={'JAX': 7.0, '#A': 2})
+    old_key = ss.vars_key()
+
+    # WHEN its vars are replaced with equal, then different, values
+    ss.vars = {'JAX': 7.0, '#A': 2}
+    same_key = ss.vars_key()
+    ss.vars = {'JAX': 8.0, '#A': 2}
+    new_key = ss.vars_key()
+
+    # THEN the key tracks the current vars
+    assert same_key == old_key
+    assert new_key != old_key
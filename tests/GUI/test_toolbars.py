@@ -114,4 +114,94 @@ class TestSecondOrderBar:
         assert testbar._w_array is original_w_array
         np.testing.assert_equal(testbar.vars, new_vars)
 
+    def test_widgets_use_rebound_callback(self, testbar):
+        """Confirm that toolbar widgets call the toolbar's current callback,
+        even if it was rebound after the widgets were created.
+        """
+        # GIVEN a displayed SecondOrderBar whose callback is rebound after
+        # creation
+        testbar.pack()
+        calls = []
+        testbar.callback = lambda: calls.append(1)
+
+        # WHEN one of its widgets calls back
+        testbar._fields['V1']._callback()
+
+        # THEN the new callback is used
+        assert len(calls) == 1
+
+    def test_widgets_built_on_first_pack(self, testbar):
+        """Confirm that entry widgets are only built once the toolbar is
+        first displayed, and with the current array values.
+        """
+        # GIVEN an undisplayed SecondOrderBar with a changed frequency
+        assert not testbar._fields
+        testbar._v_ppm[0, 0] = 1.23
+
+        # WHEN it is packed
+        testbar.pack()
+
+        # THEN its widgets are created from the current values
+        assert list(testbar._fields) == ['V1', 'V2', 'W']
+        assert testbar._fields['V1'].current_value == 1.23
+
+    def test_reset_refreshes_built_widgets(self, testbar, default_nspin_vars):
+        """Confirm that resetting a displayed toolbar updates its widgets as
+        well as its arrays.
+        """
+        # GIVEN a displayed SecondOrderBar and new v, j and w values
+        testbar.pack()
+        new_vars = default_nspin_vars
+        new_vars['v'] = np.array([[1.0, 2.0]])
+        new_vars['j'] = np.array([[0.0, 5.0],
+                                  [5.0, 0.0]])
+        new_vars['w'] = np.array([[1.5]])
+
+        # WHEN the toolbar is reset with them
+        testbar.reset(new_vars)
+
+        # THEN the entry widgets and the J array hold the new values
+        assert testbar._fields['V1'].current_value == 1.0
+        assert testbar._fields['V2'].current_value == 2.0
+        assert testbar._fields['W'].current_value == 1.5
+        np.testing.assert_array_equal(testbar._j, new_vars['j'])
+
+    def test_reset_with_current_vars_is_skipped(self, testbar, monkeypatch):
+        """Confirm that resetting with values equal to the current ones
+        neither copies the values nor refreshes the widgets.
+        """
+        # GIVEN a copy of the testbar's current vars, and spies on the
+        # copying and refreshing steps of reset
+        same_vars = {key: val.copy() for key, val in testbar.vars.items()}
+        calls = []
+        monkeypatch.setattr(np, 'copyto',
+                            lambda *args, **kwargs: calls.append('copyto'))
+        monkeypatch.setattr(testbar, '_refresh_fields',
+                            lambda: calls.append('_refresh_fields'))
+
+        # WHEN the toolbar is reset with them
+        testbar.reset(same_vars)
+
+        # THEN neither step runs
+        assert calls == []
+
+    def test_reset_j_in_place(self, testbar, default_nspin_vars):
+        """Confirm that reset updates the J array in place, without aliasing
+        the supplied array.
+        """
+        # GIVEN a new set of vars differing in J
+        new_vars = default_nspin_vars
+        new_j = np.array([[0.0, 5.0],
+                          [5.0, 0.0]])
+        new_vars['j'] = new_j
+        original_j = testbar._j
+
+        # WHEN the toolbar is reset with them
+        testbar.reset(new_vars)
+
+        # THEN the J values are copied into the original array
+        assert testbar._j is original_j
+        assert testbar._j is not new_j
+        np.testing.assert_array_equal(testbar._j, new_j)
+
 # TODO: add tests for SecondOrderSpinBar if you decide to use it
@@ -1,6 +1,6 @@
 import numpy as np
 from pytest import approx
-from nmrmint.model.nmrplot import (lorentz, add_signals)
+from nmrmint.model.nmrplot import (lorentz, add_signals, decimate)
 from . import testdata
 from .accepted_data import ADD_SIGNALS_DATASET
 
@@ -54,3 +54,82 @@ def test_add_signals():
     print(Y)
     assert np.array_equal(x, X)
     assert np.array_equal(y, Y)
+
+
+def test_add_signals_reused_scratch():
+    """Test that add_signals gives the same result when reusing a scratch
+    array that holds values from a previous call.
+    """
+    x = np.linspace(390, 410, 200)
+    doublet = [(399, 1), (401, 1)]
+    expected = add_signals(x, doublet, 1)
+    scratch = np.empty_like(x)
+    add_signals(x, [(395, 3)], 2, scratch=scratch)
+    y = add_signals(x, doublet, 1, scratch=scratch)
+    assert np.array_equal(y, expected)
+    assert y is not scratch
+
+
+def test_decimate_crops_to_xlim():
+    """Test that decimate keeps only the points in the x range, plus one
+    past each limit."""
+    # GIVEN data on an evenly spaced grid
+    x = np.linspace(0, 100, 10001)
+    y = np.sin(x)
+
+    # WHEN cropped to an x range given high to low (NMR style), with enough
+    # bins that no points are merged
+    x_d, y_d = decimate(x, y, (30.005, 19.995), bins=1000)
+
+    # THEN the points in range are kept, plus one past each limit
+    assert x_d[0] < 19.995 < x_d[1]
+    assert x_d[-2] < 30.005 < x_d[-1]
+    np.testing.assert_array_equal(x_d, x[1999:3002])  # 19.99 to 30.01
+
+
+def test_decimate_preserves_peaks():
+    """Test that decimate reduces the points but keeps peak heights."""
+    # GIVEN a spectrum with narrow peaks of different heights
+    x = np.linspace(-1, 15, 160000)
+    y = np.zeros_like(x)
+    for center, height in ((1.0, 0.3), (5.0, 1.0), (9.5, 0.7)):
+        y += height / (1 + ((x - center) / 0.001) ** 2)
+
+    # WHEN decimated to far fewer bins than points
+    x_d, y_d = decimate(x, y, (-1, 15), bins=500)
+
+    # THEN far fewer points remain, in order, and every peak top is kept
+    assert len(x_d) <= 2 * 500 + len(x) % 500
+    assert np.all(np.diff(x_d) > 0)
+    for center in (1.0, 5.0, 9.5):
+        window = np.abs(x - center) < 0.01
+        assert y[window].max() in y_d
+
+
+def test_decimate_flat_bins_not_duplicated():
+    """Test that a bin whose minimum and maximum are the same point only
+    contributes it once."""
+    # GIVEN flat data
+    x = np.linspace(0, 10, 1000)
+    y = np.zeros_like(x)
+
+    # WHEN decimated
+    x_d, y_d = decimate(x, y, (0, 10), bins=100)
+
+    # THEN each bin contributes a single point
+    assert len(x_d) == 100
+    assert len(np.unique(x_d)) == len(x_d)
+
+
+def test_decimate_passes_through_sparse_data():
+    """Test that data with fewer than 3 points per bin is not decimated."""
+    # GIVEN fewer than 3 points per bin
+    x = np.linspace(0, 10, 100)
+    y = np.cos(x)
+
+    # WHEN decimated
+    x_d, y_d = decimate(x, y, (0, 10), bins=50)
+
+    # THEN the data is returned unchanged
+    np.testing.assert_array_equal(x_d, x)
+    np.testing.assert_array_equal(y_d, y)